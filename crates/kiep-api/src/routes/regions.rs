@@ -129,36 +129,47 @@ async fn compare_regions(
     State(state): State<Arc<AppState>>,
     Query(params): Query<CompareParams>,
 ) -> Result<Json<Vec<RegionDetail>>, AppError> {
-    let codes: Vec<&str> = params.codes.split(',').map(|s| s.trim()).filter(|s| !s.is_empty()).collect();
-
-    let mut results = Vec::new();
-    for code in codes.iter().take(10) {
-        if let Some(region) = sqlx::query_as::<_, RegionDetail>(
-            r#"
-            SELECT
-                r.code, r.name, r.province, r.center_lon, r.center_lat, r.area_km2,
-                (SELECT COUNT(*) FROM companies c WHERE c.bjd_code = r.code) as company_count,
-                (SELECT COALESCE(SUM(es.employee_count::bigint), 0)
-                 FROM employment_series es
-                 JOIN companies c ON c.biz_no = es.biz_no
-                 WHERE c.bjd_code = r.code
-                 AND es.year_month = (SELECT MAX(year_month) FROM employment_series)
-                ) as employee_count
-            FROM regions r
-            WHERE r.code = $1
-            "#,
-        )
-        .bind(code)
-        .fetch_optional(&state.pool)
-        .await?
-        {
-            results.push(region);
-        }
-    }
+    let results = fetch_region_details(&state.pool, &parse_codes(&params.codes)).await?;
 
     Ok(Json(results))
 }
 
+fn parse_codes(codes: &str) -> Vec<String> {
+    codes
+        .split(',')
+        .map(|s| s.trim())
+        .filter(|s| !s.is_empty())
+        .take(10)
+        .map(String::from)
+        .collect()
+}
+
+/// Fetch details for several regions with a single query, preserving request order.
+async fn fetch_region_details(
+    pool: &sqlx::PgPool,
+    codes: &[String],
+) -> Result<Vec<RegionDetail>, sqlx::Error> {
+    sqlx::query_as::<_, RegionDetail>(
+        r#"
+        SELECT
+            r.code, r.name, r.province, r.center_lon, r.center_lat, r.area_km2,
+            (SELECT COUNT(*) FROM companies c WHERE c.bjd_code = r.code) as company_count,
+            (SELECT COALESCE(SUM(es.employee_count::bigint), 0)
+             FROM employment_series es
+             JOIN companies c ON c.biz_no = es.biz_no
+             WHERE c.bjd_code = r.code
+             AND es.year_month = (SELECT MAX(year_month) FROM employment_series)
+            ) as employee_count
+        FROM regions r
+        WHERE r.code = ANY($1)
+        ORDER BY array_position($1, r.code)
+        "#,
+    )
+    .bind(codes)
+    .fetch_all(pool)
+    .await
+}
+
 // Shared error type for API routes
 pub struct AppError(anyhow::Error);
 
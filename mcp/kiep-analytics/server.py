@@ -9,18 +9,162 @@ Provides 5 tools for Claude Desktop integration:
 5. predict_complex_risk - 산업단지 리스크 예측
 """
 
+import asyncio
+import bisect
+import heapq
 import os
+import re
+from functools import lru_cache
+from operator import itemgetter
+from typing import TYPE_CHECKING
+
 import httpx
+import msgspec
+from async_lru import alru_cache
 from fastmcp import FastMCP
 
+if TYPE_CHECKING:
+    import numpy as np
+
 API_BASE = os.getenv("KIEP_API_URL", "http://localhost:3100")
 
+client = httpx.AsyncClient(
+    base_url=API_BASE,
+    timeout=30.0,
+    # httpx only negotiates HTTP/2 over TLS (ALPN), so this has no effect on the
+    # default plain-http KIEP_API_URL; it applies once the API is behind https
+    http2=True,
+    limits=httpx.Limits(
+        max_connections=200,
+        max_keepalive_connections=50,
+        keepalive_expiry=30,
+    ),
+)
+
 mcp = FastMCP(
     "KIEP Analytics",
     description="한국 산업 생태계 분석 도구 — 6개 공공데이터 통합 분석",
 )
 
-client = httpx.AsyncClient(base_url=API_BASE, timeout=30.0)
+BIZ_RE = re.compile(r"[0-9]{10}")
+REGION_RE = re.compile(r"[0-9]{5}")
+_DASH_REMOVE = str.maketrans("", "", "-")
+
+# Lower bounds of each band; a score equal to a threshold belongs to the upper band
+BAND_THRESHOLDS = (40, 55, 70, 85)
+BAND_LABELS = ("위험", "주의", "보통", "양호", "우수")
+RISK_THRESHOLDS = (25, 50)
+RISK_LABELS = ("낮음", "보통", "높음")
+RISK_FACTOR_LABELS = {
+    "low_occupancy": "낮은 분양률 ({:.1f}%)".format,
+    "mid_occupancy": "보통 분양률 ({:.1f}%)".format,
+    "low_operating": "낮은 가동률 ({:.1f}%)".format,
+    "mid_operating": "보통 가동률 ({:.1f}%)".format,
+    "small_employment": "소규모 고용 ({}명)".format,
+}
+
+
+# Thresholds are integers, so truncating the score never changes its band
+@lru_cache(maxsize=128)
+def _band(score_int: int) -> str:
+    return BAND_LABELS[bisect.bisect_right(BAND_THRESHOLDS, score_int)]
+
+
+@lru_cache(maxsize=128)
+def _risk_level(score_int: int) -> str:
+    return RISK_LABELS[bisect.bisect_right(RISK_THRESHOLDS, score_int)]
+
+
+def classify_band_batch(scores: "np.ndarray") -> "np.ndarray":
+    """건강도 점수 배열을 등급 라벨 배열로 한 번에 변환합니다.
+
+    다수 지역 일괄 분류용이며 결과는 `_band(int(score))`와 같습니다.
+    NaN·무한대 점수는 단건 경로처럼 오류로 처리합니다.
+    numpy가 필요합니다 (`pip install -e ".[batch]"`).
+    """
+    import numpy as np
+
+    scores = np.asarray(scores, dtype=float)
+    if not np.isfinite(scores).all():
+        raise ValueError("health scores must be finite")
+    labels = np.array(BAND_LABELS, dtype=object)
+    return np.take(labels, np.searchsorted(BAND_THRESHOLDS, np.trunc(scores), side="right"))
+
+
+# Response shapes — only the fields the tools read; unknown fields are ignored.
+# Every field is nullable because the Rust API serializes Option<> columns as null.
+class Industry(msgspec.Struct):
+    name: str | None = ""
+    count: int | None = 0
+
+
+class Region(msgspec.Struct):
+    code: str | None = ""
+    name: str | None = ""
+    province: str | None = ""
+    health_score: float | None = 0
+    company_count: int | None = 0
+    employee_count: int | None = 0
+    growth_rate: float | None = 0
+    top_industries: list[Industry] = []
+
+
+class RegionHealth(msgspec.Struct):
+    new_biz_rate: float | None = 0
+    closure_rate: float | None = 0
+    revenue_growth: float | None = 0
+
+
+class Company(msgspec.Struct):
+    name: str | None = ""
+    status: str | None = ""
+    industry_name: str | None = ""
+    address: str | None = ""
+    employee_count: int | None = 0
+    employment_history: list[dict] = []
+    financials: list[dict] = []
+    procurement_count: int | None = 0
+    procurement_amount: int | None = 0
+    recent_procurement: list[dict] = []
+    health_score: float | None = 0
+    region_code: str | None = ""
+
+
+class Complex(msgspec.Struct):
+    id: str | None = ""
+    complex_code: str | None = ""
+    name: str | None = ""
+    tenant_count: int | None = 0
+    operating_count: int | None = 0
+    occupancy_rate: float | None = 0
+    employment: int | None = 0
+
+
+# /api/complexes/{id} wraps the row as {"complex": ..., "series": [...], ...}.
+# Detail fields default to None so a missing key never overwrites a list value.
+class ComplexDetail(msgspec.Struct):
+    id: str | None = None
+    name: str | None = None
+    tenant_count: int | None = None
+    operating_count: int | None = None
+    occupancy_rate: float | None = None
+
+
+class ComplexSeriesEntry(msgspec.Struct):
+    employment: int | None = None
+
+
+class ComplexProfile(msgspec.Struct):
+    complex: ComplexDetail
+    series: list[ComplexSeriesEntry] = []
+
+
+_region_decoder = msgspec.json.Decoder(Region)
+_region_list_decoder = msgspec.json.Decoder(list[Region])
+_health_decoder = msgspec.json.Decoder(RegionHealth)
+_company_decoder = msgspec.json.Decoder(Company)
+_complex_profile_decoder = msgspec.json.Decoder(ComplexProfile)
+_complex_list_decoder = msgspec.json.Decoder(list[Complex])
 
 
 @mcp.tool()
@@ -35,40 +179,72 @@ async def get_region_health(
     Returns:
         건강도 점수, 구성 지표, 등급 정보
     """
-    resp = await client.get(f"/api/regions/{region_code}")
+    if not REGION_RE.fullmatch(region_code):
+        return {"error": "지역코드는 5자리 숫자여야 합니다"}
+
+    resp, health_resp = await asyncio.gather(
+        client.get(f"/api/regions/{region_code}"),
+        client.get(f"/api/health/{region_code}"),
+    )
     if resp.status_code == 404:
         return {"error": f"지역코드 {region_code}를 찾을 수 없습니다"}
-    region = resp.json()
-
-    health_resp = await client.get(f"/api/health/{region_code}")
-    health = health_resp.json() if health_resp.status_code == 200 else {}
-
-    score = region.get("health_score", 0)
-    band = (
-        "위험" if score < 40
-        else "주의" if score < 55
-        else "보통" if score < 70
-        else "양호" if score < 85
-        else "우수"
-    )
+    # msgspec.ValidationError subclasses DecodeError, so this covers both
+    try:
+        region = _region_decoder.decode(resp.content)
+    except msgspec.DecodeError:
+        return {"error": f"지역코드 {region_code}를 찾을 수 없습니다"}
+    health = RegionHealth()
+    if health_resp.status_code == 200:
+        try:
+            health = _health_decoder.decode(health_resp.content)
+        except msgspec.DecodeError:
+            pass
+
+    score = region.health_score or 0
+    band = _band(int(score))
 
     return {
         "region_code": region_code,
-        "region_name": region.get("name", ""),
-        "province": region.get("province", ""),
+        "region_name": region.name,
+        "province": region.province,
         "health_score": score,
         "health_band": band,
         "metrics": {
-            "company_count": region.get("company_count", 0),
-            "employee_count": region.get("employee_count", 0),
-            "growth_rate": region.get("growth_rate", 0),
-            "new_biz_rate": health.get("new_biz_rate", 0),
-            "closure_rate": health.get("closure_rate", 0),
-            "revenue_growth": health.get("revenue_growth", 0),
+            "company_count": region.company_count,
+            "employee_count": region.employee_count,
+            "growth_rate": region.growth_rate,
+            "new_biz_rate": health.new_biz_rate,
+            "closure_rate": health.closure_rate,
+            "revenue_growth": health.revenue_growth,
         },
     }
 
 
+async def _fetch_regions_each(region_codes: list[str]) -> list[Region]:
+    """지역별 개별 GET을 동시에 실행합니다 (일괄 조회 미지원 시 사용)."""
+
+    async def _fetch(code: str) -> tuple[str, httpx.Response]:
+        return code, await client.get(f"/api/regions/{code}")
+
+    responses = await asyncio.gather(*map(_fetch, region_codes), return_exceptions=True)
+
+    regions = []
+    for item in responses:
+        if isinstance(item, BaseException):
+            continue
+        code, resp = item
+        if resp.status_code != 200:
+            continue
+        try:
+            region = _region_decoder.decode(resp.content)
+        except msgspec.DecodeError:
+            continue
+        if not region.code:
+            region = msgspec.structs.replace(region, code=code)
+        regions.append(region)
+    return regions
+
+
 @mcp.tool()
 async def compare_regions(
     region_codes: list[str],
@@ -84,33 +260,45 @@ async def compare_regions(
     if len(region_codes) > 5:
         return {"error": "최대 5개 지역까지 비교 가능합니다"}
 
-    results = []
-    for code in region_codes:
-        resp = await client.get(f"/api/regions/{code}")
-        if resp.status_code == 200:
-            data = resp.json()
-            results.append({
-                "region_code": code,
-                "name": data.get("name", ""),
-                "health_score": data.get("health_score", 0),
-                "company_count": data.get("company_count", 0),
-                "employee_count": data.get("employee_count", 0),
-                "growth_rate": data.get("growth_rate", 0),
-            })
+    requested = set(region_codes)
+    resp = await client.get("/api/regions/compare", params={"codes": ",".join(region_codes)})
+    regions = []
+    if resp.status_code == 200:
+        try:
+            regions = _region_list_decoder.decode(resp.content)
+        except msgspec.DecodeError:
+            pass
+    if not any(region.code in requested for region in regions):
+        # Batch lookup unavailable or ignored `codes` — fall back to concurrent per-region GETs
+        regions = await _fetch_regions_each(region_codes)
+
+    results = [
+        {
+            "region_code": region.code,
+            "name": region.name,
+            "health_score": region.health_score or 0,
+            "company_count": region.company_count or 0,
+            "employee_count": region.employee_count or 0,
+            "growth_rate": region.growth_rate or 0,
+        }
+        for region in regions
+        if region.code in requested
+    ]
 
     if not results:
         return {"error": "유효한 지역을 찾을 수 없습니다"}
 
-    # Rank by health score
-    ranked = sorted(results, key=lambda r: r["health_score"], reverse=True)
-    for i, r in enumerate(ranked):
-        r["health_rank"] = i + 1
+    # Rank by health score; this order is also the output order
+    ranked = sorted(results, key=itemgetter("health_score"), reverse=True)
+    for i, r in enumerate(ranked, 1):
+        r["health_rank"] = i
+        r["health_score_rank"] = i
 
-    metrics = ["health_score", "company_count", "employee_count", "growth_rate"]
+    metrics = ["company_count", "employee_count", "growth_rate"]
     for metric in metrics:
-        sorted_by = sorted(results, key=lambda r: r[metric], reverse=True)
-        for i, r in enumerate(sorted_by):
-            r[f"{metric}_rank"] = i + 1
+        sorted_by = sorted(results, key=itemgetter(metric), reverse=True)
+        for i, r in enumerate(sorted_by, 1):
+            r[f"{metric}_rank"] = i
 
     return {
         "comparison": ranked,
@@ -119,6 +307,14 @@ async def compare_regions(
     }
 
 
+@alru_cache(maxsize=4, ttl=60)
+async def _fetch_regions(limit: int) -> list[Region]:
+    """/api/regions 목록을 60초간 캐시합니다. 반환된 리스트는 공유되므로 수정하지 마세요."""
+    resp = await client.get("/api/regions", params={"limit": limit})
+    resp.raise_for_status()
+    return _region_list_decoder.decode(resp.content)
+
+
 @mcp.tool()
 async def find_industry_cluster(
     industry: str,
@@ -135,34 +331,34 @@ async def find_industry_cluster(
     Returns:
         해당 산업 집적도가 높은 지역 목록
     """
-    resp = await client.get("/api/regions", params={"limit": 250})
-    if resp.status_code != 200:
+    try:
+        regions = await _fetch_regions(250)
+    except (httpx.HTTPStatusError, msgspec.DecodeError):
         return {"error": "지역 데이터를 불러올 수 없습니다"}
 
-    regions = resp.json()
     clusters = []
 
     for region in regions:
-        industries = region.get("top_industries", [])
-        match = None
-        for ind in industries:
-            if industry in ind.get("name", ""):
-                match = ind
-                break
-
-        if match and match.get("count", 0) >= min_companies:
+        match = next(
+            (
+                ind for ind in region.top_industries
+                if industry in (ind.name or "") and (ind.count or 0) >= min_companies
+            ),
+            None,
+        )
+
+        if match:
             clusters.append({
-                "region_code": region.get("code", ""),
-                "region_name": region.get("name", ""),
-                "province": region.get("province", ""),
-                "industry_name": match.get("name", ""),
-                "company_count": match.get("count", 0),
-                "employee_count": region.get("employee_count", 0),
-                "health_score": region.get("health_score", 0),
+                "region_code": region.code,
+                "region_name": region.name,
+                "province": region.province,
+                "industry_name": match.name,
+                "company_count": match.count or 0,
+                "employee_count": region.employee_count,
+                "health_score": region.health_score,
             })
 
-    clusters.sort(key=lambda c: c["company_count"], reverse=True)
-    top = clusters[:top_n]
+    top = heapq.nlargest(top_n, clusters, key=itemgetter("company_count"))
 
     return {
         "industry": industry,
@@ -184,47 +380,97 @@ async def get_company_360(
     Returns:
         NPS+NTS+FSC+PPS 통합 기업 프로필
     """
-    clean_biz = biz_no.replace("-", "")
-    if len(clean_biz) != 10:
-        return {"error": "사업자등록번호는 10자리여야 합니다"}
+    clean_biz = biz_no.translate(_DASH_REMOVE)
+    if not BIZ_RE.fullmatch(clean_biz):
+        return {"error": "사업자등록번호는 10자리 숫자여야 합니다"}
 
     resp = await client.get(f"/api/companies/{clean_biz}")
     if resp.status_code == 404:
         return {"error": f"사업자등록번호 {clean_biz}에 해당하는 기업을 찾을 수 없습니다"}
 
-    company = resp.json()
+    try:
+        company = _company_decoder.decode(resp.content)
+    except msgspec.DecodeError:
+        return {"error": f"사업자등록번호 {clean_biz}에 해당하는 기업을 찾을 수 없습니다"}
 
     return {
         "biz_no": clean_biz,
-        "name": company.get("name", ""),
-        "status": company.get("status", ""),
-        "industry": company.get("industry_name", ""),
-        "address": company.get("address", ""),
+        "name": company.name,
+        "status": company.status,
+        "industry": company.industry_name,
+        "address": company.address,
         "employment": {
-            "current": company.get("employee_count", 0),
-            "history": company.get("employment_history", []),
+            "current": company.employee_count,
+            "history": company.employment_history,
         },
-        "financials": company.get("financials", []),
+        "financials": company.financials,
         "procurement": {
-            "total_contracts": company.get("procurement_count", 0),
-            "total_amount": company.get("procurement_amount", 0),
-            "recent": company.get("recent_procurement", []),
+            "total_contracts": company.procurement_count,
+            "total_amount": company.procurement_amount,
+            "recent": company.recent_procurement,
         },
-        "health_score": company.get("health_score", 0),
-        "region_code": company.get("region_code", ""),
+        "health_score": company.health_score,
+        "region_code": company.region_code,
     }
 
 
+def _merge_profile(cx: Complex, profile: ComplexProfile) -> Complex:
+    """상세 프로필 값을 목록 항목 위에 덮어씁니다.
+
+    상세에 없는 필드는 목록 값을 유지하고, 고용 인원이 없으면 최신 분기 시계열 값을 사용합니다.
+    """
+    detail = profile.complex
+    updates = {
+        field: value
+        for field in ComplexDetail.__struct_fields__
+        if (value := getattr(detail, field)) is not None
+    }
+    if not cx.employment and profile.series:
+        # series is ordered latest quarter first
+        updates["employment"] = profile.series[0].employment
+    return msgspec.structs.replace(cx, **updates)
+
+
+async def _enrich_complexes(complexes: list[Complex]) -> list[Complex]:
+    """단지별 상세 GET을 동시 실행해 목록 항목을 보강합니다. 실패한 항목은 그대로 둡니다."""
+    # Created per call so it binds to the running loop and caps each request at 20 in flight
+    sem = asyncio.Semaphore(20)
+
+    async def _bounded_get(url: str) -> httpx.Response:
+        async with sem:
+            return await client.get(url)
+
+    responses = await asyncio.gather(
+        *[_bounded_get(f"/api/complexes/{cx.id or cx.complex_code}") for cx in complexes],
+        return_exceptions=True,
+    )
+
+    enriched = []
+    for cx, resp in zip(complexes, responses):
+        if isinstance(resp, BaseException) or resp.status_code != 200:
+            enriched.append(cx)
+            continue
+        try:
+            profile = _complex_profile_decoder.decode(resp.content)
+        except msgspec.DecodeError:
+            enriched.append(cx)
+            continue
+        enriched.append(_merge_profile(cx, profile))
+    return enriched
+
+
 @mcp.tool()
 async def predict_complex_risk(
     complex_code: str = "",
     province: str = "",
+    enrich: bool = False,
 ) -> dict:
     """산업단지의 리스크를 분석합니다.
 
     Args:
         complex_code: 산업단지 코드 (선택). 예: "COMPLEX-0001"
         province: 시도명으로 필터 (선택). 예: "경기도"
+        enrich: 목록 조회 시 단지별 상세 정보로 보강 (기본 False)
 
     Returns:
         가동률, 분양률, 고용 추이 기반 리스크 분석
@@ -237,19 +483,33 @@ async def predict_complex_risk(
         resp = await client.get(f"/api/complexes/{complex_code}")
         if resp.status_code == 404:
             return {"error": f"산업단지 {complex_code}를 찾을 수 없습니다"}
-        complexes = [resp.json()]
+        try:
+            profile = _complex_profile_decoder.decode(resp.content)
+        except msgspec.DecodeError:
+            # Also covers the API's 200 `null` body for an unknown id
+            return {"error": f"산업단지 {complex_code}를 찾을 수 없습니다"}
+        complexes = [_merge_profile(Complex(complex_code=complex_code), profile)]
     else:
         resp = await client.get("/api/complexes", params=params)
         if resp.status_code != 200:
             return {"error": "산업단지 데이터를 불러올 수 없습니다"}
-        complexes = resp.json()
-
-    risk_results = []
-    for cx in complexes:
-        tenant = cx.get("tenant_count", 0) or 1
-        operating = cx.get("operating_count", 0)
-        occupancy = cx.get("occupancy_rate", 0)
-        employment = cx.get("employment", 0)
+        try:
+            complexes = _complex_list_decoder.decode(resp.content)
+        except msgspec.DecodeError:
+            return {"error": "산업단지 데이터를 불러올 수 없습니다"}
+        if enrich:
+            complexes = await _enrich_complexes(complexes)
+
+    # Keep only the top 20 in a min-heap keyed on (risk_score, -index); the
+    # negated index makes ties favour earlier complexes, like a stable sort.
+    # Factors stay as (tag, value) pairs until a complex makes the final cut.
+    top_heap: list[tuple[int, int, Complex, float, str, list[tuple[str, float]]]] = []
+    high_risk_count = 0
+    for idx, cx in enumerate(complexes):
+        tenant = cx.tenant_count or 1
+        operating = cx.operating_count or 0
+        occupancy = cx.occupancy_rate or 0
+        employment = cx.employment or 0
 
         op_rate = (operating / tenant) * 100 if tenant > 0 else 0
 
@@ -259,55 +519,74 @@ async def predict_complex_risk(
 
         if occupancy < 70:
             risk_score += 30
-            factors.append(f"낮은 분양률 ({occupancy:.1f}%)")
+            factors.append(("low_occupancy", occupancy))
         elif occupancy < 85:
             risk_score += 15
-            factors.append(f"보통 분양률 ({occupancy:.1f}%)")
+            factors.append(("mid_occupancy", occupancy))
 
         if op_rate < 60:
             risk_score += 30
-            factors.append(f"낮은 가동률 ({op_rate:.1f}%)")
+            factors.append(("low_operating", op_rate))
         elif op_rate < 80:
             risk_score += 15
-            factors.append(f"보통 가동률 ({op_rate:.1f}%)")
+            factors.append(("mid_operating", op_rate))
 
         if employment < 1000:
             risk_score += 20
-            factors.append(f"소규모 고용 ({employment}명)")
-
-        risk_level = (
-            "높음" if risk_score >= 50
-            else "보통" if risk_score >= 25
-            else "낮음"
-        )
-
-        risk_results.append({
-            "complex_code": cx.get("id", cx.get("complex_code", "")),
-            "name": cx.get("name", ""),
+            factors.append(("small_employment", employment))
+
+        risk_level = _risk_level(risk_score)
+        if risk_level == "높음":
+            high_risk_count += 1
+
+        entry = (risk_score, -idx, cx, op_rate, risk_level, factors)
+        if len(top_heap) < 20:
+            heapq.heappush(top_heap, entry)
+        else:
+            heapq.heappushpop(top_heap, entry)
+
+    results = [
+        {
+            "complex_code": cx.id or cx.complex_code,
+            "name": cx.name,
             "risk_score": risk_score,
             "risk_level": risk_level,
-            "factors": factors,
+            "factors": [RISK_FACTOR_LABELS[tag](value) for tag, value in factors],
             "metrics": {
-                "occupancy_rate": occupancy,
+                "occupancy_rate": cx.occupancy_rate or 0,
                 "operating_rate": round(op_rate, 1),
-                "tenant_count": tenant,
-                "employment": employment,
+                "tenant_count": cx.tenant_count or 1,
+                "employment": cx.employment or 0,
             },
-        })
+        }
+        for risk_score, _, cx, op_rate, risk_level, factors in sorted(top_heap, reverse=True)
+    ]
 
-    risk_results.sort(key=lambda r: r["risk_score"], reverse=True)
-
-    high_risk = [r for r in risk_results if r["risk_level"] == "높음"]
     return {
-        "total_analyzed": len(risk_results),
-        "high_risk_count": len(high_risk),
-        "results": risk_results[:20],
-        "summary": f"총 {len(risk_results)}개 단지 분석, {len(high_risk)}개 고위험",
+        "total_analyzed": len(complexes),
+        "high_risk_count": high_risk_count,
+        "results": results,
+        "summary": f"총 {len(complexes)}개 단지 분석, {high_risk_count}개 고위험",
     }
 
 
+async def _serve() -> None:
+    # The lifespan hook runs once per session, so the shared client is
+    # closed here, after the server itself has stopped.
+    async with client:
+        await mcp.run_async()
+
+
 def main():
-    mcp.run()
+    try:
+        import uvloop
+    except ImportError:  # uvloop is unavailable on Windows
+        pass
+    else:
+        # uvloop.install() is deprecated on 3.12+; the policy API itself is
+        # deprecated in 3.14, at which point switch to asyncio.run(loop_factory=...)
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    asyncio.run(_serve())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,396 @@
+import asyncio
+
+import httpx
+import pytest
+
+import server
+
+
+@pytest.fixture
+def mock_api(monkeypatch):
+    """server.client를 주어진 핸들러로 응답하는 MockTransport 클라이언트로 교체합니다."""
+
+    def install(handler):
+        monkeypatch.setattr(
+            server,
+            "client",
+            httpx.AsyncClient(base_url="http://test", transport=httpx.MockTransport(handler)),
+        )
+        server._fetch_regions.cache_clear()
+
+    return install
+
+
+def test_company_360_accepts_null_strings(mock_api):
+    def handler(request):
+        return httpx.Response(200, json={
+            "name": "테스트기업",
+            "address": None,
+            "status": None,
+            "region_code": None,
+            "employee_count": 12,
+        })
+
+    mock_api(handler)
+    result = asyncio.run(server.get_company_360("123-45-67890"))
+
+    assert result["name"] == "테스트기업"
+    assert result["address"] is None
+    assert result["employment"]["current"] == 12
+
+
+def test_company_360_returns_error_on_undecodable_body(mock_api):
+    mock_api(lambda request: httpx.Response(200, content=b"not json"))
+
+    result = asyncio.run(server.get_company_360("1234567890"))
+
+    assert "error" in result
+
+
+def test_compare_regions_skips_undecodable_fallback_rows(mock_api):
+    def handler(request):
+        if request.url.path == "/api/regions/compare":
+            return httpx.Response(404)
+        if request.url.path == "/api/regions/11010":
+            return httpx.Response(200, json={"name": "종로구", "health_score": 70})
+        return httpx.Response(200, json={"name": ["not", "a", "string"]})
+
+    mock_api(handler)
+    result = asyncio.run(server.compare_regions(["11010", "11020"]))
+
+    assert [r["region_code"] for r in result["comparison"]] == ["11010"]
+
+
+def test_compare_regions_uses_single_compare_request(mock_api):
+    seen = []
+
+    def handler(request):
+        seen.append(request.url.path)
+        return httpx.Response(200, json=[
+            {"code": "11010", "name": "종로구", "health_score": 70},
+            {"code": "11020", "name": "중구", "health_score": 50},
+        ])
+
+    mock_api(handler)
+    result = asyncio.run(server.compare_regions(["11010", "11020"]))
+
+    assert seen == ["/api/regions/compare"]
+    assert [r["region_code"] for r in result["comparison"]] == ["11010", "11020"]
+
+
+def test_compare_regions_falls_back_when_codes_are_ignored(mock_api):
+    def handler(request):
+        if request.url.path == "/api/regions/compare":
+            # a server that ignores `codes` and returns an unrelated list
+            return httpx.Response(200, json=[{"code": "26110", "name": "부산 중구"}])
+        code = request.url.path.rsplit("/", 1)[1]
+        return httpx.Response(200, json={"code": code, "name": code, "health_score": 60})
+
+    mock_api(handler)
+    result = asyncio.run(server.compare_regions(["11010", "11020"]))
+
+    assert sorted(r["region_code"] for r in result["comparison"]) == ["11010", "11020"]
+
+
+def _complex_profile(row: dict, employment: int | None) -> dict:
+    """/api/complexes/{id}가 반환하는 실제 중첩 응답 형태입니다."""
+    return {
+        "complex": {
+            "sigungu": "화성시",
+            "designated_area": 1.5,
+            "industrial_area": 1.1,
+            **row,
+        },
+        "series": [
+            {"year_quarter": "2025Q2", "production": 10, "export_amount": 5,
+             "employment": employment, "operating_count": row.get("operating_count")},
+            {"year_quarter": "2025Q1", "production": 9, "export_amount": 4,
+             "employment": 1, "operating_count": 1},
+        ],
+        "top_companies": [],
+    }
+
+
+HEALTHY = {
+    "id": "COMPLEX-0001",
+    "name": "건강산단",
+    "complex_type": "일반",
+    "province": "경기도",
+    "tenant_count": 100,
+    "operating_count": 90,
+    "occupancy_rate": 95.0,
+}
+
+
+def test_predict_complex_risk_enrich_merges_nested_profile(mock_api):
+    def handler(request):
+        if request.url.path == "/api/complexes":
+            return httpx.Response(200, json=[{**HEALTHY, "employment": 5000}])
+        return httpx.Response(200, json=_complex_profile(HEALTHY, employment=3))
+
+    mock_api(handler)
+    result = asyncio.run(server.predict_complex_risk(enrich=True))
+
+    [row] = result["results"]
+    assert row["complex_code"] == "COMPLEX-0001"
+    assert row["name"] == "건강산단"
+    assert row["risk_score"] == 0
+    assert row["risk_level"] == "낮음"
+    # employment comes only from the list entry and must survive the merge
+    assert row["metrics"]["employment"] == 5000
+
+
+def test_predict_complex_risk_enrich_fills_employment_from_series(mock_api):
+    def handler(request):
+        if request.url.path == "/api/complexes":
+            return httpx.Response(200, json=[HEALTHY])
+        return httpx.Response(200, json=_complex_profile(HEALTHY, employment=5000))
+
+    mock_api(handler)
+    result = asyncio.run(server.predict_complex_risk(enrich=True))
+
+    assert result["results"][0]["metrics"]["employment"] == 5000
+    assert result["high_risk_count"] == 0
+
+
+def test_predict_complex_risk_single_complex_uses_nested_profile(mock_api):
+    mock_api(lambda request: httpx.Response(200, json=_complex_profile(HEALTHY, employment=5000)))
+
+    result = asyncio.run(server.predict_complex_risk(complex_code="COMPLEX-0001"))
+
+    [row] = result["results"]
+    assert row["name"] == "건강산단"
+    assert row["risk_level"] == "낮음"
+
+
+def test_predict_complex_risk_single_complex_null_body_is_not_found(mock_api):
+    mock_api(lambda request: httpx.Response(200, json=None))
+
+    result = asyncio.run(server.predict_complex_risk(complex_code="COMPLEX-9999"))
+
+    assert "error" in result
+
+
+def test_region_health_treats_null_score_as_zero(mock_api):
+    def handler(request):
+        if request.url.path.startswith("/api/health/"):
+            return httpx.Response(404)
+        return httpx.Response(200, json={"code": "11010", "name": "종로구", "health_score": None})
+
+    mock_api(handler)
+    result = asyncio.run(server.get_region_health("11010"))
+
+    assert result["health_score"] == 0
+    assert result["health_band"] == "위험"
+
+
+def test_compare_regions_ranks_null_metrics_as_zero(mock_api):
+    mock_api(lambda request: httpx.Response(200, json=[
+        {"code": "11010", "name": "종로구", "health_score": None, "company_count": 10},
+        {"code": "11020", "name": "중구", "health_score": 55, "company_count": None},
+    ]))
+
+    result = asyncio.run(server.compare_regions(["11010", "11020"]))
+
+    assert [r["region_code"] for r in result["comparison"]] == ["11020", "11010"]
+    assert result["comparison"][1]["health_score"] == 0
+    assert result["comparison"][1]["company_count_rank"] == 1
+
+
+def test_classify_band_batch_matches_single_score_band():
+    np = pytest.importorskip("numpy")
+    scores = [-0.5, 0, 39, 39.99, 40, 54.9, 55, 69.99, 70, 84.5, 85, 100]
+
+    batch = server.classify_band_batch(np.array(scores))
+
+    assert batch.tolist() == [server._band(int(s)) for s in scores]
+
+
+@pytest.mark.parametrize("bad", [float("nan"), float("inf")])
+def test_classify_band_batch_rejects_non_finite_like_single_path(bad):
+    np = pytest.importorskip("numpy")
+
+    with pytest.raises((ValueError, OverflowError)):
+        server._band(int(bad))
+    with pytest.raises(ValueError):
+        server.classify_band_batch(np.array([50.0, bad]))
+
+
+def test_predict_complex_risk_enrich_survives_repeated_event_loops(mock_api):
+    # list rows lack occupancy and operating counts, so every row whose detail
+    # fetch fails scores as high risk
+    rows = [
+        {"id": f"COMPLEX-{i:04d}", "tenant_count": 100, "operating_count": None,
+         "occupancy_rate": None, "employment": 5000}
+        for i in range(50)
+    ]
+
+    async def handler(request):
+        if request.url.path == "/api/complexes":
+            return httpx.Response(200, json=rows)
+        await asyncio.sleep(0)
+        return httpx.Response(200, json=_complex_profile(HEALTHY, employment=5000))
+
+    mock_api(handler)
+    # more complexes than the concurrency cap forces waits on the semaphore
+    for _ in range(2):
+        result = asyncio.run(server.predict_complex_risk(enrich=True))
+        assert result["total_analyzed"] == 50
+        assert result["high_risk_count"] == 0
+
+
+def test_compare_regions_ranks_each_metric_with_stable_ties(mock_api):
+    mock_api(lambda request: httpx.Response(200, json=[
+        {"code": "11010", "name": "A", "health_score": 60, "company_count": 5,
+         "employee_count": 100, "growth_rate": 1.0},
+        {"code": "11020", "name": "B", "health_score": 80, "company_count": 5,
+         "employee_count": 300, "growth_rate": -1.0},
+        {"code": "11030", "name": "C", "health_score": 70, "company_count": 9,
+         "employee_count": 200, "growth_rate": 2.0},
+    ]))
+
+    result = asyncio.run(server.compare_regions(["11010", "11020", "11030"]))
+    ranks = {
+        r["region_code"]: (
+            r["health_rank"], r["health_score_rank"], r["company_count_rank"],
+            r["employee_count_rank"], r["growth_rate_rank"],
+        )
+        for r in result["comparison"]
+    }
+
+    assert [r["region_code"] for r in result["comparison"]] == ["11020", "11030", "11010"]
+    assert result["best_health"] == "B"
+    # equal company_count keeps request order: 11010 before 11020
+    assert ranks == {
+        "11010": (3, 3, 2, 3, 2),
+        "11020": (1, 1, 3, 1, 3),
+        "11030": (2, 2, 1, 2, 1),
+    }
+
+
+def test_predict_complex_risk_keeps_top_20_in_stable_order(mock_api):
+    # every third complex scores 80 (high), 45 (medium) or 0 (low)
+    profiles = [
+        {"occupancy_rate": 60.0, "operating_count": 50, "employment": 500},
+        {"occupancy_rate": 80.0, "operating_count": 50, "employment": 5000},
+        {"occupancy_rate": 95.0, "operating_count": 90, "employment": 5000},
+    ]
+    rows = [
+        {"id": f"C{i:02d}", "name": f"단지{i}", "tenant_count": 100, **profiles[i % 3]}
+        for i in range(30)
+    ]
+    mock_api(lambda request: httpx.Response(200, json=rows))
+
+    result = asyncio.run(server.predict_complex_risk())
+
+    high = [f"C{i:02d}" for i in range(0, 30, 3)]
+    medium = [f"C{i:02d}" for i in range(1, 30, 3)]
+    assert result["total_analyzed"] == 30
+    assert result["high_risk_count"] == 10
+    assert [r["complex_code"] for r in result["results"]] == high + medium
+    assert [r["risk_score"] for r in result["results"]] == [80] * 10 + [45] * 10
+
+
+@pytest.mark.parametrize("score, band", [
+    (0, "위험"), (39, "위험"), (40, "주의"), (54, "주의"), (55, "보통"),
+    (69, "보통"), (70, "양호"), (84, "양호"), (85, "우수"), (100, "우수"),
+])
+def test_region_health_band_boundaries(mock_api, score, band):
+    def handler(request):
+        if request.url.path.startswith("/api/health/"):
+            return httpx.Response(404)
+        return httpx.Response(200, json={"code": "11010", "health_score": score})
+
+    mock_api(handler)
+    result = asyncio.run(server.get_region_health("11010"))
+
+    assert result["health_band"] == band
+
+
+@pytest.mark.parametrize("score, level", [
+    (0, "낮음"), (24, "낮음"), (25, "보통"), (49, "보통"), (50, "높음"), (80, "높음"),
+])
+def test_risk_level_boundaries(score, level):
+    assert server._risk_level(score) == level
+
+
+@pytest.mark.parametrize("row, score, level", [
+    # occupancy < 70 (+30) and employment < 1000 (+20) lands exactly on 50
+    ({"occupancy_rate": 69.9, "operating_count": 80, "employment": 999}, 50, "높음"),
+    # occupancy 70 and operating rate 80 sit on the upper side of both cut-offs
+    ({"occupancy_rate": 70.0, "operating_count": 80, "employment": 1000}, 15, "낮음"),
+    ({"occupancy_rate": 85.0, "operating_count": 60, "employment": 1000}, 15, "낮음"),
+    ({"occupancy_rate": 84.9, "operating_count": 59, "employment": 1000}, 45, "보통"),
+])
+def test_predict_complex_risk_scoring_boundaries(mock_api, row, score, level):
+    mock_api(lambda request: httpx.Response(200, json=[{"id": "C1", "tenant_count": 100, **row}]))
+
+    [result] = asyncio.run(server.predict_complex_risk())["results"]
+
+    assert (result["risk_score"], result["risk_level"]) == (score, level)
+
+
+@pytest.mark.parametrize("score, band", [
+    (39.99, "위험"), (40.0, "주의"), (54.99, "주의"), (69.5, "보통"), (84.99, "양호"), (85.0, "우수"),
+])
+def test_region_health_truncates_fractional_scores_without_crossing_bands(mock_api, score, band):
+    def handler(request):
+        if request.url.path.startswith("/api/health/"):
+            return httpx.Response(404)
+        return httpx.Response(200, json={"code": "11010", "health_score": score})
+
+    mock_api(handler)
+    result = asyncio.run(server.get_region_health("11010"))
+
+    assert result["health_score"] == score
+    assert result["health_band"] == band
+
+
+def test_band_cache_shares_entries_across_fractional_scores():
+    server._band.cache_clear()
+
+    assert server._band(int(69.2)) == server._band(int(69.9)) == "보통"
+    assert server._band.cache_info().hits == 1
+
+
+def _refuse_requests(request):
+    raise AssertionError(f"invalid input must not reach the API: {request.url}")
+
+
+@pytest.mark.parametrize("biz_no", [
+    "abc1234567",
+    "1234567890\n",
+    "123456789",
+    "12345678901",
+    "１２３４５６７８９０",  # full-width digits
+    "١٢٣٤٥٦٧٨٩٠",  # Arabic-Indic digits
+])
+def test_company_360_rejects_malformed_biz_no(mock_api, biz_no):
+    mock_api(_refuse_requests)
+
+    result = asyncio.run(server.get_company_360(biz_no))
+
+    assert result == {"error": "사업자등록번호는 10자리 숫자여야 합니다"}
+
+
+def test_company_360_strips_dashes_before_validating(mock_api):
+    seen = []
+
+    def handler(request):
+        seen.append(request.url.path)
+        return httpx.Response(200, json={"name": "테스트기업"})
+
+    mock_api(handler)
+    result = asyncio.run(server.get_company_360("123-45-67890"))
+
+    assert result["biz_no"] == "1234567890"
+    assert seen == ["/api/companies/1234567890"]
+
+
+@pytest.mark.parametrize("region_code", ["1101a", "11010\n", "1101", "110100", "１１０１０", ""])
+def test_region_health_rejects_malformed_region_code(mock_api, region_code):
+    mock_api(_refuse_requests)
+
+    result = asyncio.run(server.get_region_health(region_code))
+
+    assert result == {"error": "지역코드는 5자리 숫자여야 합니다"}